@@ -263,7 +263,7 @@ class HingeArm(Agent):
         # create a grid of coordinates
         coordinates = np.array(np.meshgrid(*list([np.arange(-1, 1, 2/resolution)]) * self.n_motors))
         # reshape the coordinates into matrix of size (reso**n_motors, n_motors)
-        motor_grid = np.array([coord.reshape((-1)) for coord in coordinates]).T
+        motor_grid = coordinates.reshape((self.n_motors, -1)).T
         # get the corresponding positions
         pos_grid = self.get_position_from_motor(motor_grid)
         return motor_grid, pos_grid
@@ -291,8 +291,9 @@ class HingeArm3dof(HingeArm):
         """
         Get the coordinates of the sensor via trigonometry.
         """
-        x = np.sum(np.multiply(self.segments_length, np.cos(np.cumsum(self.motor_amplitude * motor, axis=1))), axis=1, keepdims=True)
-        y = np.sum(np.multiply(self.segments_length, np.sin(np.cumsum(self.motor_amplitude * motor, axis=1))), axis=1, keepdims=True)
+        angles = np.cumsum(self.motor_amplitude * motor, axis=1)
+        x = np.sum(np.multiply(self.segments_length, np.cos(angles)), axis=1, keepdims=True)
+        y = np.sum(np.multiply(self.segments_length, np.sin(angles)), axis=1, keepdims=True)
         return np.hstack((x, y))
 
     def display(self, motor):
@@ -342,8 +343,9 @@ class HingeArm6dof(HingeArm):
         seg_lengths = np.array(self.segments_length) * np.hstack((np.ones((motor.shape[0], 1)),
                                                                   self.motor_amplitude[4:] * motor[:, 4:],
                                                                   np.ones((motor.shape[0], 1))))
-        x = np.sum(np.multiply(seg_lengths, np.cos(np.cumsum(self.motor_amplitude[0:4] * motor[:, 0:4], axis=1))), axis=1, keepdims=True)
-        y = np.sum(np.multiply(seg_lengths, np.sin(np.cumsum(self.motor_amplitude[0:4] * motor[:, 0:4], axis=1))), axis=1, keepdims=True)
+        angles = np.cumsum(self.motor_amplitude[0:4] * motor[:, 0:4], axis=1)
+        x = np.sum(np.multiply(seg_lengths, np.cos(angles)), axis=1, keepdims=True)
+        y = np.sum(np.multiply(seg_lengths, np.sin(angles)), axis=1, keepdims=True)
         return np.hstack((x, y))
 
     def display(self, motor):
@@ -22,6 +22,8 @@ class Environment:
             dimension of the sensory input produced at each sensor position
         environment_size: [int, int] or [float, float]
             size of the environment
+        sensor_dtype: numpy dtype
+            data type of the sensory inputs
 
         get_sensation_at_position(position):
             generate the sensory inputs associated with input holistic sensor positions
@@ -33,12 +35,13 @@ class Environment:
             logs the environment's parameters
     """
 
-    def __init__(self, type_environment, n_sensations, environment_size):
+    def __init__(self, type_environment, n_sensations, environment_size, sensor_dtype=np.float32):
         self.type = type_environment
         self.n_sensations = n_sensations
         self.environment_size = environment_size
+        self.sensor_dtype = sensor_dtype
 
-    def get_sensation_at_position(self, position):
+    def get_sensation_at_position(self, position, display=False, out=None):
         return None
 
     def generate_shift(self, k):
@@ -111,7 +114,7 @@ class GridWorld(Environment):
                                   np.arange(0, 1, 1/self.environment_size[1]))
 
         # create the pos2sensation_mapping
-        pos2sensation_mapping = np.full((len(coordinates[0][0]), len(coordinates[0][1]), self.n_sensations), np.nan)
+        pos2sensation_mapping = np.full((len(coordinates[0][0]), len(coordinates[0][1]), self.n_sensations), np.nan, dtype=self.sensor_dtype)
         for i in range(self.n_sensations):
 
             # draw random parameters (and ensure every even parameter is not too small)
@@ -129,12 +132,13 @@ class GridWorld(Environment):
 
         return pos2sensation_mapping
 
-    def get_sensation_at_position(self, position, display=False):
+    def get_sensation_at_position(self, position, display=False, out=None):
         """
         Returns the sensations at a given set of input positions.
         (Warping is applied to the grid if self.tore=True.)
         Inputs:
             position - (N, 2) array
+            out - (optional) (N, 4) array of type self.sensor_dtype in which the sensations are written
         Returns:
             sensations - (N, 4) array
         """
@@ -142,19 +146,24 @@ class GridWorld(Environment):
         # deal with the case of a single position
         position = position.reshape(-1, 2)
 
+        # prepare variable
+        sensations = np.empty((position.shape[0], self.n_sensations), dtype=self.sensor_dtype) if out is None else out
+
         if self.tore:  # warp the grid
 
             position[:, 0] = position[:, 0] % self.environment_size[0]
             position[:, 1] = position[:, 1] % self.environment_size[1]
 
-            sensations = self.pos2value_mapping[position[:, 0], position[:, 1]]
+            # gather the sensations from the flattened mapping (all the positions are valid after warping, so clipping is a no-op)
+            np.take(self.pos2value_mapping.reshape(-1, self.n_sensations), position[:, 0] * self.pos2value_mapping.shape[1] + position[:, 1],
+                    axis=0, out=sensations, mode="clip")
 
         else:  # returns np.nan sensations for positions outside the grid
 
             valid_index = (position[:, 0] >= 0) & (position[:, 0] < self.environment_size[0]) &\
                           (position[:, 1] >= 0) & (position[:, 1] < self.environment_size[1])
 
-            sensations = np.full((position.shape[0], self.n_sensations), np.nan)
+            sensations.fill(np.nan)
             sensations[valid_index, :] = self.pos2value_mapping[position[valid_index, 0], position[valid_index, 1]]
 
         if display:
@@ -214,7 +223,7 @@ class GQNRoom(Environment):
     """
 
     def __init__(self, n_obstacles=16):
-        super().__init__(type_environment="3dRoom", n_sensations=16*16*3, environment_size=(7, 7))
+        super().__init__(type_environment="3dRoom", n_sensations=16*16*3, environment_size=(7, 7), sensor_dtype=np.uint8)
         self.n_obstacles = n_obstacles
         self.scene = tools.build_scene(fix_light_position=True)
         # create the objects
@@ -224,11 +233,12 @@ class GQNRoom(Environment):
                             discrete_position=False,
                             rotate_object=False)
 
-    def get_sensation_at_position(self, position, display=False):
+    def get_sensation_at_position(self, position, display=False, out=None):
         """
         Returns the sensations at a given set of input positions.
         Inputs:
             position - (N, 2) array
+            out - (optional) (N, self.n_sensations) array of type self.sensor_dtype in which the sensations are written
         Returns:
             sensations - (self.n_sensations, 4) array
         """
@@ -238,8 +248,8 @@ class GQNRoom(Environment):
         # deal with the case of a single position
         position = position.reshape(-1, 2)
 
-        # prepare variable
-        sensations = np.full((position.shape[0], self.n_sensations), np.nan)
+        # prepare variable (every sensation is filled with a rendered image)
+        sensations = np.empty((position.shape[0], self.n_sensations), dtype=self.sensor_dtype) if out is None else out
 
         # create the camera
         perspective_camera = gqn.pyrender.PerspectiveCamera(yfov=np.pi / 4)
@@ -355,7 +365,8 @@ class GQNBulletRoom(Environment):
         super().__init__(
             type_environment="3dRoom",
             n_sensations=16*16*3,
-            environment_size=(7, 7))
+            environment_size=(7, 7),
+            sensor_dtype=np.uint8)
         self.n_obstacles = n_obstacles
 
         # Build the scene
@@ -373,11 +384,12 @@ class GQNBulletRoom(Environment):
         self.camera = Camera(45, CameraResolution(16, 16))
         self.camera.setTranslation([0, -1, 1])
 
-    def get_sensation_at_position(self, position, display=False):
+    def get_sensation_at_position(self, position, display=False, out=None):
         """
         Returns the sensations at a given set of input positions.
         Inputs:
             position - (N, 2) array
+            out - (optional) (N, self.n_sensations) array of type self.sensor_dtype in which the sensations are written
         Returns:
             sensations - (self.n_sensations, 4) array
         """
@@ -388,8 +400,8 @@ class GQNBulletRoom(Environment):
         # Deal with the case of a single position
         position = position.reshape(-1, 2)
 
-        # Prepare variable
-        sensations = np.full((position.shape[0], self.n_sensations), np.nan)
+        # Prepare variable (every sensation is filled with a rendered image)
+        sensations = np.empty((position.shape[0], self.n_sensations), dtype=self.sensor_dtype) if out is None else out
 
         # set the camera orientation
         yaw, pitch = bullet_tools.compute_yaw_and_pitch(camera_direction)
@@ -3,28 +3,37 @@ import time
 import tensorflow as tf
 import numpy as np
 import _pickle as cpickle
-from sklearn import linear_model
+import pickle
 from scipy.spatial.distance import pdist
 import platform
 import subprocess
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 
-def mlp(input_net, layers_sizes, activation=tf.nn.selu):
+def write_pickle(destination, obj):
+    """
+    Pickles obj and writes it in the file destination.
+    The highest protocol is used (protocol 4 on the Python versions supported by TensorFlow 1.15), which handles large NumPy arrays.
+    """
+    with open(destination, "wb") as file:
+        cpickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def mlp(layers_sizes, activation=tf.nn.selu, name=None):
     """
     Parameters:
-        input_net - node used as input to the MLP
         layers_sizes - list of the sizes of the successives layers of the MLP
         activation - activation function used in the MLP
+        name - name of the MLP
+    Returns:
+        model - MLP model which can be called on several input nodes while sharing the same weights
     """
-    current_input = input_net
-    for layer_index, nbr_units in enumerate(layers_sizes[0:-1]):
-        current_input = tf.layers.dense(inputs=current_input,
-                                        units=nbr_units,
-                                        activation=activation,
-                                        name="layer" + str(layer_index))
-    output = tf.layers.dense(inputs=current_input, units=layers_sizes[-1], activation=None, name='layerend')
-    return output
+    layers = [tf.keras.layers.Dense(units=nbr_units, activation=activation, name="layer" + str(layer_index))
+              for layer_index, nbr_units in enumerate(layers_sizes[0:-1])]
+    layers.append(tf.keras.layers.Dense(units=layers_sizes[-1], activation=None, name='layerend'))
+    model = tf.keras.Sequential(layers, name=name)
+    return model
 
 
 class SensorimotorPredictiveNetwork:
@@ -65,7 +74,13 @@ class SensorimotorPredictiveNetwork:
         self.learning_rate_param = learning_rate_param
         self.batch_size = batch_size
         self.model_destination = model_destination
-        self.lin_reg_model = linear_model.LinearRegression(fit_intercept=True)
+
+        # lookup table of the pairwise distances of the regular sampling of sensor positions and of their weightings, filled by cache_grid_distances()
+        # when the data are bound in full_train (grid_pos doesn't change during training)
+        self.grid_cache = {"pdist": None, "weightings": {}}
+
+        # random generator used to draw the evaluation minibatches
+        self.rng = np.random.default_rng()
 
         # get the activation function (a temporary string is used to simply log the class attributes in self.log())
         if self.activation == "selu":
@@ -79,56 +94,63 @@ class SensorimotorPredictiveNetwork:
         # reset the default graph
         tf.reset_default_graph()
 
-        # create input and output placeholders
-        self.motor_t = tf.placeholder(dtype=tf.float32, shape=[None, self.dim_motor], name='motor_t')
-        self.motor_tp = tf.placeholder(dtype=tf.float32, shape=[None, self.dim_motor], name='motor_tp')
-        self.sensor_t = tf.placeholder(dtype=tf.float32, shape=[None, self.dim_sensor], name='sensor_t')
-        self.sensor_tp = tf.placeholder(dtype=tf.float32, shape=[None, self.dim_sensor], name='sensor_tp')
+        # create the placeholder used to load the whole set of transitions into the input pipeline (packed by pack_transitions())
+        self.data_transitions = tf.placeholder(dtype=tf.float32, shape=[None, 2 * self.dim_motor + 2 * self.dim_sensor], name='data_transitions')
+
+        # create the input pipeline delivering shuffled minibatches (drop_remainder keeps the batch dimension fixed to avoid XLA recompilations)
+        dataset = tf.data.Dataset.from_tensor_slices(self.data_transitions)
+        dataset = dataset.shuffle(buffer_size=10000).repeat().batch(self.batch_size, drop_remainder=True).prefetch(tf.data.experimental.AUTOTUNE)
+        self.iterator = tf.data.make_initializable_iterator(dataset)
+
+        # get the minibatch of packed transitions (it can also be fed directly, as done in track_progress) and split it into inputs and outputs
+        self.transitions = self.iterator.get_next()
+        self.motor_t, self.motor_tp, self.sensor_t, self.sensor_tp = self.split_transitions(self.transitions)
 
-        # create placeholders for the dissimilarity measures
-        self.metric_error = tf.placeholder(dtype=tf.float32, shape=[], name='metric_error')
-        self.topology_error_in_P = tf.placeholder(dtype=tf.float32, shape=[], name='topology_error_in_P')
-        self.topology_error_in_H = tf.placeholder(dtype=tf.float32, shape=[], name='topology_error_in_H')
+        # define the motor encoding module (shared by all the copies of the module) and the predictive module
+        self.encoding_module = mlp(layers_sizes=self.encoding_layers_size + [self.dim_enc], activation=activation, name="motor_encoding")
+        self.prediction_module = mlp(layers_sizes=self.predictive_layers_size + [self.dim_sensor], name="sensory_prediction")
 
         # define the network
-        # define the motor encoding modules
-        with tf.variable_scope("motor_encoding", reuse=tf.AUTO_REUSE):
+        self.output_encode_module_t, self.output_encode_module_tp, self.output_prediction_module, self.loss = \
+            self.build_network(self.motor_t, self.motor_tp, self.sensor_t, self.sensor_tp)
 
-            # create the first copy of the encoding module
-            self.output_encode_module_t = mlp(input_net=self.motor_t,
-                                              layers_sizes=self.encoding_layers_size + [self.dim_enc],
-                                              activation=activation)
+        # create the device-resident copy of the regular motor sampling encoded in track_progress (it doesn't change during training)
+        # it is a local variable, so that it is neither checkpointed nor reset by the initialization of the global variables, and its
+        # initial value is fed through the placeholder grid_motor_init in load_data()
+        self.grid_motor_init = tf.placeholder(dtype=tf.float32, shape=[None, self.dim_motor], name='grid_motor_init')
+        self.grid_motor = tf.Variable(self.grid_motor_init, trainable=False, validate_shape=False, collections=[tf.GraphKeys.LOCAL_VARIABLES],
+                                      name="grid_motor")
+        self.output_encode_module_grid = self.encoding_module(tf.reshape(self.grid_motor, [-1, self.dim_motor]))
 
-            # create the second copy of the encoding module
-            self.output_encode_module_tp = mlp(input_net=self.motor_tp,
-                                               layers_sizes=self.encoding_layers_size + [self.dim_enc],
-                                               activation=activation)
+        # define the learning rate
+        self.global_step = tf.Variable(0, trainable=False)
 
-        # concatenate the motor encodings with the sensory input
-        concatenation = tf.concat([self.output_encode_module_t, self.output_encode_module_tp, self.sensor_t], axis=1, name='concat')
+        def get_learning_rate():
+            return tf.train.polynomial_decay(self.learning_rate_param[0], self.global_step, self.learning_rate_param[2],
+                                             self.learning_rate_param[1], power=self.learning_rate_param[3])
 
-        # define the predictive module
-        with tf.variable_scope("sensory_prediction", reuse=tf.AUTO_REUSE):
-            self.output_prediction_module = mlp(input_net=concatenation, layers_sizes=self.predictive_layers_size + [self.dim_sensor])
+        self.learning_rate = get_learning_rate()
 
-        # define the loss
-        loss = tf.reduce_sum(tf.squared_difference(self.output_prediction_module, self.sensor_tp), axis=1)
-        self.loss = tf.reduce_mean(loss, axis=0)
+        # define the optimizer (the learning rate is passed as a callable so that it is updated at each step of the training loop)
+        optimizer = tf.train.AdamOptimizer(learning_rate=get_learning_rate)
 
-        # define the learning rate
-        self.global_step = tf.Variable(0, trainable=False)
-        self.learning_rate = tf.train.polynomial_decay(self.learning_rate_param[0], self.global_step, self.learning_rate_param[2],
-                                                       self.learning_rate_param[1], power=self.learning_rate_param[3])
+        # use float16 computations on the GPU (the variables and loss stay in float32 and the loss is dynamically scaled)
+        optimizer = tf.train.experimental.enable_mixed_precision_graph_rewrite(optimizer)
 
-        # define the optimizer
-        optimizer = tf.train.AdamOptimizer(learning_rate=self.learning_rate)
-        self.minimize_op = optimizer.minimize(self.loss, global_step=self.global_step)
+        # define the training loop, which runs n_steps optimization steps on successive minibatches in a single call to sess.run
+        self.n_steps = tf.placeholder(dtype=tf.int32, shape=[], name='n_steps')
 
-        # create trackers for Tensorboard
+        def training_step(step, _):
+            _, _, _, loss_step = self.build_network(*self.split_transitions(self.iterator.get_next()))
+            minimize_op = optimizer.minimize(loss_step, global_step=self.global_step)
+            with tf.control_dependencies([minimize_op]):
+                return step + 1, tf.identity(loss_step)
+
+        _, self.training_loss = tf.while_loop(lambda step, _: step < self.n_steps, training_step, [tf.constant(0), tf.constant(0.0)],
+                                              parallel_iterations=1, name='training_loop')
+
+        # create trackers for Tensorboard (the dissimilarity measures are computed outside the graph and directly written in track_progress)
         tf.summary.scalar("loss", self.loss)
-        tf.summary.scalar("metric_error", self.metric_error)
-        tf.summary.scalar("topology_error_in_P", self.topology_error_in_P)
-        tf.summary.scalar("topology_error_in_H", self.topology_error_in_H)
         tf.summary.scalar("learning_rate", self.learning_rate)
         self.merged_summaries = tf.summary.merge_all()
         self.graph = tf.get_default_graph()  # get the default graph
@@ -137,26 +159,90 @@ class SensorimotorPredictiveNetwork:
         # create a saver
         self.saver = tf.train.Saver()
 
+        # create once the folders where the model and the data to display by display_progress.py are saved (their paths don't change during training)
+        self.destinations = {"model": self.model_destination + "/model",
+                             "display_progress": self.model_destination + "/display_progress"}
+        for dest in self.destinations.values():
+            os.makedirs(dest, exist_ok=True)
+
+        # the meta graph doesn't change during training, so it is only written with the first checkpoint
+        self.meta_graph_saved = False
+
         # token session
         self.sess = None
 
-    def train(self, data, number_epochs=1):
+        # token callables used to evaluate the network in track_progress (created with the session)
+        self.encode_motor = None
+        self.evaluate_prediction = None
+
+        # token executor used to write files in the background during training, and future of the last write of the display data
+        self.io_executor = None
+        self.display_data_saved = None
+
+    def build_network(self, motor_t, motor_tp, sensor_t, sensor_tp):
         """
-        Perform <number_epochs> iterations of training on minibatches from the transitions <data>.
+        Applies the motor encoding and sensory prediction modules to the input tensors (the weights are shared by all the calls).
+        Returns:
+            output_encode_module_t - encoding of motor_t
+            output_encode_module_tp - encoding of motor_tp
+            output_prediction_module - prediction of sensor_tp
+            loss - mean squared prediction error
         """
 
-        # run the optimization for number_epochs iterations
-        current_loss = None
-        for k in range(number_epochs):
+        # encode motor_t and motor_tp in a single pass of the encoding module on the stacked batch
+        output_encode_module = self.encoding_module(tf.concat([motor_t, motor_tp], axis=0))
+        output_encode_module_t, output_encode_module_tp = tf.split(output_encode_module, 2, axis=0)
+
+        # concatenate the motor encodings with the sensory input
+        concatenation = tf.concat([output_encode_module_t, output_encode_module_tp, sensor_t], axis=1, name='concat')
+
+        # define the predictive module
+        output_prediction_module = self.prediction_module(concatenation)
+
+        # define the loss
+        loss = tf.reduce_sum(tf.squared_difference(output_prediction_module, sensor_tp), axis=1)
+        loss = tf.reduce_mean(loss, axis=0)
+
+        return output_encode_module_t, output_encode_module_tp, output_prediction_module, loss
 
-            # draw indexes with repeat (without repeat significantly increases computation time)
-            batch_indexes = np.random.choice(data["motor_t"].shape[0], self.batch_size, replace=True)
+    def split_transitions(self, transitions):
+        """
+        Splits a batch of packed transitions into its motor_t, motor_tp, sensor_t, and sensor_tp components.
+        """
+        return tf.split(transitions, [self.dim_motor, self.dim_motor, self.dim_sensor, self.dim_sensor], axis=1)
+
+    @staticmethod
+    def pack_transitions(data):
+        """
+        Packs the motor_t, motor_tp, sensor_t, and sensor_tp arrays of <data> into a single contiguous float32 array,
+        so that a minibatch can be gathered in a single indexing operation.
+        """
+
+        # allocate the packed array once and convert each component while copying it into its columns
+        components = [data["motor_t"], data["motor_tp"], data["sensor_t"], data["sensor_tp"]]
+        transitions = np.empty((components[0].shape[0], sum(component.shape[1] for component in components)), dtype=np.float32)
+        column = 0
+        for component in components:
+            transitions[:, column:column + component.shape[1]] = component
+            column += component.shape[1]
 
-            # run the optimization
-            current_loss, _ = self.sess.run([self.loss, self.minimize_op], feed_dict={self.motor_t: data["motor_t"][batch_indexes, :],
-                                                                                      self.sensor_t: data["sensor_t"][batch_indexes, :],
-                                                                                      self.motor_tp: data["motor_tp"][batch_indexes, :],
-                                                                                      self.sensor_tp: data["sensor_tp"][batch_indexes, :]})
+        return transitions
+
+    def load_data(self, transitions, grid_motor):
+        """
+        Loads the <transitions> packed by pack_transitions() into the input pipeline used by train(),
+        and the regular motor sampling <grid_motor> on the device for track_progress().
+        """
+        self.sess.run([self.iterator.initializer, self.grid_motor.initializer],
+                      feed_dict={self.data_transitions: transitions, self.grid_motor_init: grid_motor})
+
+    def train(self, number_epochs=1):
+        """
+        Perform <number_epochs> iterations of training on minibatches drawn from the input pipeline (see load_data()).
+        """
+
+        # run the optimization for number_epochs iterations
+        current_loss = self.sess.run(self.training_loss, feed_dict={self.n_steps: number_epochs})
         current_epoch = self.sess.run(self.global_step)
 
         return current_epoch, current_loss
@@ -180,18 +266,35 @@ class SensorimotorPredictiveNetwork:
                 command = "exec python3 display_progress.py -f " + self.model_destination + "/display_progress/display_data.pkl"
                 display_proc = subprocess.Popen([command], shell=True)
 
-        # open a session
-        with tf.Session() as self.sess:
+        # enable XLA auto-clustering so that the small dense/activation/loss ops get fused into fewer kernels
+        config = tf.ConfigProto()
+        config.graph_options.optimizer_options.global_jit_level = tf.OptimizerOptions.ON_1
+
+        # open a session and a background thread to write the network and display data (pending writes are completed on exit)
+        with tf.Session(config=config) as self.sess, ThreadPoolExecutor(max_workers=1) as self.io_executor:
 
             # initialize the variables
             self.sess.run(tf.global_variables_initializer())
 
+            # pack the transitions and load them into the input pipeline, along with the regular motor sampling
+            transitions = self.pack_transitions(data)
+            self.load_data(transitions, data["grid_motor"])
+
+            # precompute the distances of the regular sampling of sensor positions and their weightings used by track_progress
+            self.cache_grid_distances(data["grid_pos"])
+
+            # create the callables used by track_progress (the fetches and feeds are processed only once instead of at each call)
+            self.encode_motor = self.sess.make_callable(self.output_encode_module_grid)
+            self.evaluate_prediction = self.sess.make_callable([self.loss, self.merged_summaries, self.output_prediction_module, self.sensor_tp,
+                                                                self.global_step],
+                                                               feed_list=[self.transitions])
+
             # iterate
             epoch = 0
             t0 = time.time()
 
             # initial evaluation of the network
-            fitted_p, metric_error, topo_error_in_P, topo_error_in_H, encoding, prediction, sensation = self.track_progress(data)
+            fitted_p, metric_error, topo_error_in_P, topo_error_in_H, encoding, prediction, sensation = self.track_progress(data, transitions)
 
             print("epoch: {:6d}, loss: _, metric error: {:.2e}, topo error in P: {:.2e}, topo error in H: {:.2e} - ({:.2f} sec)"
                   .format(epoch, metric_error, topo_error_in_P, topo_error_in_H, time.time() - t0))
@@ -199,10 +302,13 @@ class SensorimotorPredictiveNetwork:
             while epoch < n_epochs:
 
                 # train for 1000 epochs
-                epoch, current_loss = self.train(data=data, number_epochs=1000)
+                epoch, current_loss = self.train(number_epochs=1000)
+
+                # save the network in the background while it is evaluated
+                network_saved = self.save_network()
 
                 # get tracked variables and send them to Tensorboard
-                fitted_p, metric_error, topo_error_in_P, topo_error_in_H, encoding, prediction, sensation = self.track_progress(data)
+                fitted_p, metric_error, topo_error_in_P, topo_error_in_H, encoding, prediction, sensation = self.track_progress(data, transitions)
 
                 if save_frames:
                     if "index" not in locals():
@@ -211,7 +317,8 @@ class SensorimotorPredictiveNetwork:
                         import matplotlib.pyplot as plt
                     else:
                         index += 1
-                    with open(self.model_destination + "/display_progress/display_data.pkl", "rb") as f:
+                    self.display_data_saved.result()
+                    with open(self.destinations["display_progress"] + "/display_data.pkl", "rb") as f:
                         data_to_display = cpickle.load(f)
                     figframe = display_data(data_to_display, fig_number=9)
                     dir_frames = self.model_destination + "/frames"
@@ -223,14 +330,16 @@ class SensorimotorPredictiveNetwork:
                 print("epoch: {:6d}, loss: {:.2e}, metric error: {:.2e}, topo error in P: {:.2e}, topo error in H: {:.2e} - ({:.2f} sec)"
                       .format(epoch, current_loss, metric_error, topo_error_in_P, topo_error_in_H, time.time() - t0))
 
-                # save the network
-                self.save_network()
+                # wait for the network to be saved before training it further
+                network_saved.result()
 
-                if current_loss is None:
+                # stop the training if it diverged
+                if not np.isfinite(current_loss):
+                    print("ERROR: the training loss is not finite - training stopped at epoch {}".format(epoch))
                     break
 
             # final evaluation of the network
-            fitted_p, metric_error, topo_error_in_P, topo_error_in_H, encoding, prediction, sensation = self.track_progress(data)
+            fitted_p, metric_error, topo_error_in_P, topo_error_in_H, encoding, prediction, sensation = self.track_progress(data, transitions)
 
         # kill the display process
         if disp:
@@ -247,7 +356,19 @@ class SensorimotorPredictiveNetwork:
                                                                                                                                dir_frames + "/" + str(int(time.time())))
                 display_proc = subprocess.run([command], shell=True)
 
-    def compute_weighted_affine_errors_in_P(self, target_set, origin_set, weight=0):
+    def cache_grid_distances(self, grid_pos, weights=(0, 10, 50)):
+        """
+        Computes the pairwise distances between the positions of grid_pos and their weightings exp(-weight * pdist / max(pdist))
+        for each weight of <weights>, and stores them in self.grid_cache (the lookup table used by track_progress()).
+        """
+        pdist_grid = pdist(grid_pos)
+        weightings = {}
+        for weight in weights:
+            weighting = pdist_grid * (-weight / pdist_grid.max())
+            weightings[weight] = np.exp(weighting, out=weighting)
+        self.grid_cache = {"pdist": pdist_grid, "weightings": weightings}
+
+    def compute_weighted_affine_errors_in_P(self, target_set, origin_set, weight=0, pdist_target=None, weighting=None):
         """
         Compute the affine transformation: target_set = origin_set * coef_ + intercept_
         Estimate the error between the metrics of target_set and of the projection of origin_set in the target_set space.
@@ -256,78 +377,110 @@ class SensorimotorPredictiveNetwork:
             target_set - (k, dim_target_space) array
             origin_set - (k, dim_origin_space) array
             weight - relative weight of smaller distances relative to large distances (weight >= 0, with weight = 0 for a uniform weighting)
+                     a list of weights can be passed to compute several errors from a single projection
+            pdist_target - (optional) precomputed pairwise distances of target_set
+            weighting - (optional) precomputed weighting of pdist_target associated with weight (list of weightings if weight is a list)
         Returns:
-            weighted_error - mean metric error between the projected set and the target_set
+            weighted_error - mean metric error between the projected set and the target_set (list of errors if weight is a list)
             fitted - linear projection of origin_set into the target space
         """
 
-        # fit the linear regression
-        self.lin_reg_model.fit(origin_set, target_set)
+        # deal with the case of a single weight
+        multiple_weights = isinstance(weight, list)
+        weights = weight if multiple_weights else [weight]
+        if weighting is None:
+            weightings = [None] * len(weights)
+        else:
+            weightings = weighting if multiple_weights else [weighting]
+
+        # fit the linear regression by least squares (with a column of ones for the intercept)
+        origin_set_affine = np.hstack((origin_set, np.ones((origin_set.shape[0], 1))))
+        coef = np.linalg.lstsq(origin_set_affine, target_set, rcond=None)[0]
 
         # get the projection of origin_set into the target_set space
-        fitted = self.lin_reg_model.predict(origin_set)
+        fitted = origin_set_affine @ coef
 
         # get the metrics of the target_set and the projection of origin_set
-        pdist_target = pdist(target_set)
+        if pdist_target is None:
+            pdist_target = pdist(target_set)
         pdist_fitted = pdist(fitted)
 
-        # compute the mean weighted error between the metrics
-        weighted_error = np.mean(np.absolute(pdist_fitted - pdist_target) / pdist_target.max() * np.exp(-weight * pdist_target / pdist_target.max()))
+        # compute the error between the metrics (in place to avoid temporary arrays)
+        metric_diff = np.subtract(pdist_fitted, pdist_target, out=pdist_fitted)
+        np.absolute(metric_diff, out=metric_diff)
+
+        weighted_errors = []
+        for weight, weighting in zip(weights, weightings):
+
+            # get the weighting of the distances
+            if weighting is None:
+                weighting = pdist_target * (-weight / pdist_target.max())
+                np.exp(weighting, out=weighting)
+
+            # compute the mean weighted error (with a dot product to avoid temporary arrays)
+            weighted_errors.append(np.dot(metric_diff, weighting) / (pdist_target.max() * metric_diff.size))
+
+        weighted_error = weighted_errors if multiple_weights else weighted_errors[0]
 
         return weighted_error, fitted
 
-    def compute_topology_error_in_H(self, p_set, h_set, weight=10):
+    def compute_topology_error_in_H(self, p_set, h_set, weight=10, weighting=None):
         """
         Estimates how much the topology of P_set is respected by H_set.
         Inputs:
             p_set - (k, dim_P) array
             h_set - (k, dim_H) array
             weight - relative weight of smaller P distances relative to large distances (weight >= 0, with weight = 0 for a uniform weighting)
+            weighting - (optional) precomputed weighting of the P_set distances associated with weight
         Returns:
             weighted_error - mean topological dissimilarity
         """
 
-        # get the metrics of H_set and P_set
+        # get the metrics of H_set
         pdist_h = pdist(h_set)
-        pdist_p = pdist(p_set)
 
-        # compute the mean weighted error between the metrics
-        weighted_error = np.mean(pdist_h / pdist_h.max() * np.exp(-weight * pdist_p / pdist_p.max()))
+        # get the weighting of the P_set distances
+        if weighting is None:
+            pdist_p = pdist(p_set)
+            weighting = np.multiply(pdist_p, -weight / pdist_p.max(), out=pdist_p)
+            np.exp(weighting, out=weighting)
+
+        # compute the mean weighted error between the metrics (with a dot product to avoid temporary arrays)
+        weighted_error = np.dot(pdist_h, weighting) / (pdist_h.max() * pdist_h.size)
 
         return weighted_error
 
-    def track_progress(self, data):
+    def track_progress(self, data, transitions):
         """
         Computes and saves the variables tracked via Tensorboard + save the data to display by display_progress.py
+        The evaluation minibatch is drawn from <transitions>, packed by pack_transitions().
         """
 
-        # get the encoding of the regular motor sampling
-        motor_encoding = self.sess.run(self.output_encode_module_t, feed_dict={self.motor_t: data["grid_motor"]})
+        # get the encoding of the regular motor sampling (already loaded on the device by load_data())
+        motor_encoding = self.encode_motor()
+
+        # get the distances of the regular sampling of sensor positions and their weightings (precomputed by cache_grid_distances())
+        pdist_grid = self.grid_cache["pdist"]
+        weighting_0, weighting_10, weighting_50 = (self.grid_cache["weightings"][weight] for weight in (0, 10, 50))
 
-        # compute the dissimilarities and affine projections
-        metric_err, fitted_p = self.compute_weighted_affine_errors_in_P(data["grid_pos"], motor_encoding, weight=0)
-        topo_err_in_P, _ = self.compute_weighted_affine_errors_in_P(data["grid_pos"], motor_encoding, weight=10)
-        topo_err_in_H = self.compute_topology_error_in_H(data["grid_pos"], motor_encoding, weight=50)
+        # compute the dissimilarities and affine projections (the metric and topology errors in P share the same projection)
+        (metric_err, topo_err_in_P), fitted_p = self.compute_weighted_affine_errors_in_P(data["grid_pos"], motor_encoding, weight=[0, 10],
+                                                                                         pdist_target=pdist_grid,
+                                                                                         weighting=[weighting_0, weighting_10])
+        topo_err_in_H = self.compute_topology_error_in_H(data["grid_pos"], motor_encoding, weight=50, weighting=weighting_50)
 
         # get a random batch to evaluate the prediction error (without replace significantly increases computation time)
-        batch_indexes = np.random.choice(data["motor_t"].shape[0], self.batch_size, replace=True)
+        batch_indexes = self.rng.integers(0, transitions.shape[0], size=self.batch_size)
 
         # perform sensory prediction and process the summaries
-        curr_loss, curr_summaries, predicted_sensation, gt_sensation, curr_epoch = self.sess.run([self.loss,
-                                                                                                  self.merged_summaries,
-                                                                                                  self.output_prediction_module,
-                                                                                                  self.sensor_tp,
-                                                                                                  self.global_step],
-                                                                                                 feed_dict={self.motor_t: data["motor_t"][batch_indexes, :],
-                                                                                                            self.sensor_t: data["sensor_t"][batch_indexes, :],
-                                                                                                            self.motor_tp: data["motor_tp"][batch_indexes, :],
-                                                                                                            self.sensor_tp: data["sensor_tp"][batch_indexes, :],
-                                                                                                            self.metric_error: metric_err,
-                                                                                                            self.topology_error_in_P: topo_err_in_P,
-                                                                                                            self.topology_error_in_H: topo_err_in_H})
-
-        # save the summaries
+        curr_loss, curr_summaries, predicted_sensation, gt_sensation, curr_epoch = self.evaluate_prediction(transitions[batch_indexes, :])
+
+        # save the summaries (including the dissimilarity measures, which are already known)
         self.summaries_writer.add_summary(curr_summaries, curr_epoch)
+        self.summaries_writer.add_summary(tf.Summary(value=[tf.Summary.Value(tag="metric_error", simple_value=metric_err),
+                                                            tf.Summary.Value(tag="topology_error_in_P", simple_value=topo_err_in_P),
+                                                            tf.Summary.Value(tag="topology_error_in_H", simple_value=topo_err_in_H)]),
+                                          curr_epoch)
 
         # save the data to display by display_progress.py
         display_dict = {"epoch": curr_epoch,
@@ -343,25 +496,21 @@ class SensorimotorPredictiveNetwork:
                         "predicted_sensation": predicted_sensation
                         }
 
-        # write display_dict on the disk
-        if not os.path.exists(self.model_destination + "/display_progress"):
-            os.makedirs(self.model_destination + "/display_progress")
-        with open(self.model_destination + "/display_progress/display_data.pkl", "wb") as file:
-            cpickle.dump(display_dict, file)
+        # write display_dict on the disk (in the background)
+        self.display_data_saved = self.io_executor.submit(write_pickle, self.destinations["display_progress"] + "/display_data.pkl", display_dict)
 
         return fitted_p, metric_err, topo_err_in_P, topo_err_in_H, motor_encoding, predicted_sensation, gt_sensation
 
     def save_network(self):
         """
-        Saves the network in dir_model/model.
+        Saves the network in dir_model/model, in the background.
+        Returns a future which completes once the network is saved (the network shouldn't be trained in the meantime).
         """
-        # destination where to save the model
-        dest = self.model_destination + '/model'
-        # create the folder if necessary
-        if not os.path.exists(dest):
-            os.makedirs(dest)
-        # save the model
-        self.saver.save(self.sess, dest + '/model.ckpt')
+        # save the model (the meta graph is only written with the first checkpoint)
+        network_saved = self.io_executor.submit(self.saver.save, self.sess, self.destinations["model"] + '/model.ckpt',
+                                                write_meta_graph=not self.meta_graph_saved)
+        self.meta_graph_saved = True
+        return network_saved
 
     def save(self, destination):
         """
@@ -33,11 +33,14 @@ def load_subdirectory_data(dir_exp, explo_type, run_index=None):
         event_acc = EventAccumulator(log_file)
         event_acc.Reload()
 
+        # the dissimilarity measures are logged with a "_1" suffix by older versions of the network
+        suffix = "" if "metric_error" in event_acc.Tags()["scalars"] else "_1"
+
         # extract and store the variables
         _, epochs, losses = zip(*event_acc.Scalars("loss"))
-        _,      _, topo_errors_in_P = zip(*event_acc.Scalars("topology_error_in_P_1"))
-        _,      _, topo_errors_in_H = zip(*event_acc.Scalars("topology_error_in_H_1"))
-        _,      _, metric_errors = zip(*event_acc.Scalars("metric_error_1"))
+        _,      _, topo_errors_in_P = zip(*event_acc.Scalars("topology_error_in_P" + suffix))
+        _,      _, topo_errors_in_H = zip(*event_acc.Scalars("topology_error_in_H" + suffix))
+        _,      _, metric_errors = zip(*event_acc.Scalars("metric_error" + suffix))
         var["all_epochs"] += [epochs]
         var["all_losses"] += [losses]
         var["all_topo_errors_in_P"] += [topo_errors_in_P]
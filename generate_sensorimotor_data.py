@@ -4,140 +4,165 @@ from argparse import ArgumentParser
 import uuid
 import datetime
 import json
+from concurrent.futures import ThreadPoolExecutor, Future
+import multiprocessing
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 from tools import *
 
 
-def check_savability(destination, dictionary):
-    """sanity check: try dumping a file on the disk and check it is not too large"""
-    temp_name = "/".join([destination, "temp_dump.todelete"])
-    try:
-        with open(temp_name, 'wb') as f:
-            cpickle.dump(dictionary, f)
-    except OverflowError:
-        return False
-    finally:
-        os.remove(temp_name)
-    return True
+def check_savability(destination, size):
+    """sanity check: check that <size> bytes fit on the disk"""
+    return size < shutil.disk_usage(destination).free
 
 
 def save_dictionary(destination, dictionary, filename):
-    """pickle a dictionary and save it to the disk"""
-
-    temp_name = "/".join([destination, filename])
+    """
+    save a dictionary of arrays to the disk as an uncompressed .npz archive, whose arrays can be memory-mapped when loaded
+    (the file is written under a temporary name and atomically renamed once complete)
+    """
 
-    # if the filename already exists
-    while os.path.exists(temp_name):
-        temp_name += "_bis"
+    file_name = os.path.join(destination, filename)
+    temp_name = file_name + ".tmp"
 
-    # try saving the data
+    # try saving the data (and make sure it is written on the disk before the file is renamed)
     try:
         with open(temp_name, 'wb') as f:
-            cpickle.dump(dictionary, f)
+            np.savez(f, **dictionary)
+            f.flush()
+            os.fsync(f.fileno())
     except:
         print("ERROR: saving the data to disk failed")
+        # remove the partially written file
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
         return False
 
-    # try reloading the data to ensure it was correctly saved
-    try:
-        with open(temp_name, 'rb') as f:
-            cpickle.load(f)
-    except:
-        print("ERROR: saving the data to disk failed (impossible to reload it")
-        return False
+    # give the file its final name
+    os.replace(temp_name, file_name)
 
     return True
 
 
-def generate_sensorimotor_data(agent, environment, explo_type, k, dest_data="dataset", disp=True):
+def generate_shifts(environment, explo_type, k):
+    """
+    Generates the k shifts of the environment for the first and second sensorimotor couples of the transitions, according to explo_type.
+    See generate_sensorimotor_data for the types of exploration.
+    """
+    if explo_type == 'MEM':
+        shifts_t = environment.generate_shift(k)
+        shifts_tp = environment.generate_shift(k)
+    elif explo_type == 'MM':
+        shifts_t = environment.generate_shift(k, static=True)  # use environment.generate_shift to get the correct data type
+        shifts_tp = shifts_t
+    elif explo_type == 'MME':
+        shifts_t = environment.generate_shift(k)
+        shifts_tp = shifts_t
+    else:
+        print("ERROR: wrong type of exploration - use 'MM', 'MEM', or 'MME'")
+        return None
+
+    return shifts_t, shifts_tp
+
+
+def generate_sensorimotor_data(agent, environment, k, dest_data="dataset", explo_types=("MEM", "MM", "MME"), disp=True, writer=None):
     """
-    Generates a sensorimotor dataset and save it in <dest_data>/dataset_<explo_type>.pkl.
+    Generates a sensorimotor dataset for each type of exploration in explo_types and save them in <dest_data>/dataset.npz.
     k sensorimotor transitions are generated by drawing random motor configurations and environment shifts for each sensorimotor experience.
+    The motor configurations are drawn once and shared by all the datasets, which only differ by their environment shifts, and the
+    sensations of all the datasets are generated in a single call to environment.get_sensation_at_position.
 
     Inputs:
         agent : the agent generating the motor configurations and egocentric sensor positions
         environment - the environment generating the environment shifts and the sensations associated with the holistic sensor positions
-        explo_type - type of exploration, which changes how the shifts are generated
-                     MM: the shift is always 0
-                     MEM: a different shift is drawn for the first and second sensorimotor couple of each transition
-                     MME: the same random shift is used for both sensorimotor pairs of each transition
         k - number of transitions to generate
         dest_data - directory where to save the data
+        explo_types - types of exploration, which change how the shifts are generated
+                      MM: the shift is always 0
+                      MEM: a different shift is drawn for the first and second sensorimotor couple of each transition
+                      MME: the same random shift is used for both sensorimotor pairs of each transition
         disp - display the data generated data
+        writer - (optional) executor used to save the datasets in the background, in which case the future of the save is returned
 
     Output:
-        The generated dataset is saved in <dest_data>/dataset_<explo_type>.pkl as a dictionary with the following structure:
+        The generated datasets are saved together in the archive <dest_data>/dataset.npz, in which the arrays shared by all the types of
+        exploration (motor_t, motor_tp, grid_motor, grid_pos) are stored once under their name and the other ones under <explo_type>/<name>.
+        The dataset of each type of exploration is loaded by tools.load_sensorimotor_transitions as a dictionary with the following structure:
         transitions = {"motor_t": np.array(n_transitions, agent.n_motors),
-                       "sensor_t": np.array(n_transitions, environment.n_sensations),
+                       "sensor_t": np.array(n_transitions, environment.n_sensations) of type environment.sensor_dtype,
                        "shift_t": np.array(n_transitions, 2)2,
                        "motor_tp": np.array(n_transitions, agent.n_motors),
-                       "sensor_tp": np.array(n_transitions, environment.n_sensations),
+                       "sensor_tp": np.array(n_transitions, environment.n_sensations) of type environment.sensor_dtype,
                        "shift_tp": np.array(n_transitions, 2),
                        "grid_motor": np.array(agent.size_regular_grid, agent.n_motors),
                        "grid_pos": np.array(agent.size_regular_grid, 2)
                        }
     """
 
-    print("generating {} data... ".format(explo_type))
+    print("generating {} data... ".format(", ".join(explo_types)))
 
-    # prepare the data dictionary
-    transitions = {"motor_t": np.full((k, agent.n_motors), np.nan),
-                   "sensor_t": np.full((k, environment.n_sensations), np.nan),
-                   "shift_t": np.full((k, 2), np.nan),
-                   "motor_tp": np.full((k, agent.n_motors), np.nan),
-                   "sensor_tp": np.full((k, environment.n_sensations), np.nan),
-                   "shift_tp": np.full((k, 2), np.nan),
-                   "grid_motor": np.full((agent.size_regular_grid, agent.n_motors), np.nan),
-                   "grid_pos": np.full((agent.size_regular_grid, 2), np.nan)}
+    # estimate the size of the archive from the shapes of its arrays (the motor configurations and the grids are stored once, while the
+    # sensations and shifts are stored for each type of exploration)
+    float_size = np.dtype(float).itemsize
+    sensor_size = np.dtype(environment.sensor_dtype).itemsize
+    archive_size = float_size * (2 * k * agent.n_motors + agent.size_regular_grid * (agent.n_motors + 2)) + \
+        len(explo_types) * 2 * k * (environment.n_sensations * sensor_size + 2 * float_size)
 
-    if check_savability(dest_data, transitions) is False:
-        print("ERROR: the dataset is too large to pickle - reduce the number of transitions, sensations, or motors")
+    if check_savability(dest_data, archive_size) is False:
+        print("ERROR: the datasets are too large to be saved on the disk - reduce the number of transitions, sensations, or motors")
         return False
 
-    # generate k motor states and sensor positions
+    # generate k motor states and sensor positions (shared by all the types of exploration)
     motor_t, ego_pos_t = agent.generate_random_sampling(k)
     motor_tp, ego_pos_tp = agent.generate_random_sampling(k)
 
-    # generate k shifts of the environment
-    if explo_type is 'MEM':
-        shifts_t = environment.generate_shift(k)
-        shifts_tp = environment.generate_shift(k)
-    elif explo_type is 'MM':
-        shifts_t = environment.generate_shift(k, static=True)  # use environment.generate_shift to get the correct data type
-        shifts_tp = shifts_t
-    elif explo_type is 'MME':
-        shifts_t = environment.generate_shift(k)
-        shifts_tp = shifts_t
-    else:
-        print("ERROR: wrong type of exploration - use 'MM', 'MEM', or 'MME'")
-
-    # compute the holistic position of the sensor
-    holi_pos_t = ego_pos_t + shifts_t
-    holi_pos_tp = ego_pos_tp + shifts_tp
-
-    # get the corresponding sensations
-    sensations_t = environment.get_sensation_at_position(holi_pos_t, display=disp)
-    sensations_tp = environment.get_sensation_at_position(holi_pos_tp, display=disp)
-
-    if len(np.argwhere((np.isnan(sensations_t[:, 0])) & (np.isnan(sensations_tp[:, 0])))[:, 0]) > 0:
-        print("ERROR: not all sensations are valid - consider re-running the data generation")
+    # generate k shifts of the environment for each type of exploration
+    shifts = {explo_type: generate_shifts(environment, explo_type, k) for explo_type in explo_types}
+    if any(explo_shifts is None for explo_shifts in shifts.values()):
         return False
 
+    # compute the holistic positions of the sensor for all the types of exploration, stacked as [t, tp] for each type
+    # (the sums are written directly into a single buffer, which is then passed to the environment)
+    # (its data type accommodates the egocentric positions and the shifts of all the types of exploration)
+    holi_dtype = np.result_type(ego_pos_t, ego_pos_tp, *(explo_shift for explo_shifts in shifts.values() for explo_shift in explo_shifts))
+    holi_pos = np.empty((2 * len(explo_types) * k, 2), dtype=holi_dtype)
+    for index, explo_type in enumerate(explo_types):
+        np.add(ego_pos_t, shifts[explo_type][0], out=holi_pos[2 * index * k:(2 * index + 1) * k])
+        np.add(ego_pos_tp, shifts[explo_type][1], out=holi_pos[(2 * index + 1) * k:(2 * index + 2) * k])
+
+    # get the corresponding sensations in a single pass, rendered directly in a single buffer which is then split by type of exploration
+    # and time step
+    sensations = np.empty((holi_pos.shape[0], environment.n_sensations), dtype=environment.sensor_dtype)
+    environment.get_sensation_at_position(holi_pos, display=disp, out=sensations)
+    sensations = np.split(sensations, 2 * len(explo_types))
+
     # generate a regular grid of motor configurations and sensor egocentric positions for evaluation
     grid_motor, grid_pos = agent.generate_regular_sampling()
 
-    # fill the dictionary
-    transitions["motor_t"] = motor_t
-    transitions["sensor_t"] = sensations_t
-    transitions["shift_t"] = shifts_t
-    transitions["motor_tp"] = motor_tp
-    transitions["sensor_tp"] = sensations_tp
-    transitions["shift_tp"] = shifts_tp
-    transitions["grid_motor"] = grid_motor
-    transitions["grid_pos"] = grid_pos
+    # gather the datasets of all the types of exploration in a single archive (the arrays they share are only stored once)
+    archive = {"motor_t": motor_t,
+               "motor_tp": motor_tp,
+               "grid_motor": grid_motor,
+               "grid_pos": grid_pos}
+    for index, explo_type in enumerate(explo_types):
+
+        sensations_t, sensations_tp = sensations[2 * index], sensations[2 * index + 1]
+
+        # check the validity of the sensations (only floating-point sensations can be invalid)
+        if np.issubdtype(environment.sensor_dtype, np.floating) and np.any(np.isnan(sensations_t[:, 0]) & np.isnan(sensations_tp[:, 0])):
+            print("ERROR: not all {} sensations are valid - consider re-running the data generation".format(explo_type))
+            return False
 
-    save_dictionary(dest_data, transitions, "dataset_{}.pkl".format(explo_type))
+        # fill the archive
+        archive["{}/sensor_t".format(explo_type)] = sensations_t
+        archive["{}/shift_t".format(explo_type)] = shifts[explo_type][0]
+        archive["{}/sensor_tp".format(explo_type)] = sensations_tp
+        archive["{}/shift_tp".format(explo_type)] = shifts[explo_type][1]
+
+    # save the datasets (in the background if a writer is provided)
+    if writer is None:
+        return save_dictionary(dest_data, archive, "dataset.npz")
+    return writer.submit(save_dictionary, dest_data, archive, "dataset.npz")
 
 
 def save_simulation(directory, parse, trial):
@@ -152,7 +177,7 @@ def save_simulation(directory, parse, trial):
                   "Destination": directory,
                   "code commit hash": get_git_hash()}
     try:
-        with open(directory + "/generation_params.txt", "w") as f:
+        with open(os.path.join(directory, "generation_params.txt"), "w") as f:
             json.dump(dictionary, f, indent=2)
     except:
         print("ERROR: saving generation_params.txt in {} failed".format(directory))
@@ -173,63 +198,144 @@ def display_samples(dir_data, run_index, explo_type, n=24):
     # check the data_directory exists
     check_directory_exists(dir_data)
 
-    data_directory = dir_data + "/dataset{:03}".format(run_index)
-    data_file = data_directory + "/dataset_" + explo_type + ".pkl"
+    data_directory = os.path.join(dir_data, "dataset{:03}".format(run_index))
+    data_file = os.path.join(data_directory, "dataset.npz")
 
-    # load data
-    transitions = load_sensorimotor_transitions(data_file)
+    # memory-map the data (only the displayed samples are read from the disk)
+    transitions = open_sensorimotor_dataset(data_file, explo_type, mmap_mode="r")
 
     # check the type of environment that generated the data
-    with open(data_directory + "/environment_params.txt", "r") as f:
+    with open(os.path.join(data_directory, "environment_params.txt"), "r") as f:
         dictionary = json.load(f)
     type_env = dictionary["type"]
 
     n_sensory_inputs = transitions["sensor_t"].shape[0]
 
-    fig = plt.figure(data_file, figsize=(15, 1))
+    # draw the samples
+    indexes = np.random.randint(n_sensory_inputs, size=n)
+    sensations = transitions["sensor_t"][indexes, :]
 
+    # reshape the samples as images
+    images = []
     if type_env == "GridWorld":
 
-        transitions = normalize_data(transitions)
+        # normalize the sensations in [0, 1] using the range of the whole dataset (as in normalize_data)
+        sensor_min = np.nanmin(transitions["sensor_t"], axis=0)
+        sensor_max = np.nanmax(transitions["sensor_t"], axis=0)
+        images = np.reshape((sensations - sensor_min) / (sensor_max - sensor_min), (n, -1, 1))
 
-        for i in range(n):
-            # create axes
-            ax = fig.add_subplot(1, n, i + 1)
+    elif type_env == "3dRoom":
 
-            # draw a sample
-            index = np.random.randint(n_sensory_inputs)
-            vector = transitions["sensor_t"][index, :]
+        side = int(np.sqrt(sensations.shape[1] // 3))
+        images = np.reshape(sensations, (n, side, side, 3)) / 255
 
-            # reshape as an image
-            image = 0.5 * np.reshape(vector, (-1, 1)) + 0.5
+    fig = plt.figure("{} - {}".format(data_file, explo_type), figsize=(15, 1))
 
-            # display
-            ax.imshow(image)
-            ax.axis("off")
+    for i, image in enumerate(images):
 
-    elif type_env == "3dRoom":
+        # create axes
+        ax = fig.add_subplot(1, n, i + 1)
+
+        # display
+        ax.imshow(image)
+        ax.axis("off")
+
+    plt.show()
+
+    return fig
 
-        for i in range(n):
 
-            # create axes
-            ax = fig.add_subplot(1, n, i+1)
+def generate_trial(args, trial, writer=None):
+    """
+    Generates the datasets of a trial in <args.dir_data>/dataset<trial>, with a new agent and environment of type args.type_simu.
+    Inputs:
+        args - arguments parsed by the main program
+        trial - index of the trial
+        writer - (optional) executor used to save the datasets in the background
+    Returns:
+        None if the trial already exists, False if args.type_simu is invalid, the future of the save of its datasets if writer is
+        provided, and the output of check_trial_generated otherwise
+    """
 
-            # draw a sample
-            index = np.random.randint(n_sensory_inputs)
-            image = transitions["sensor_t"][index, :]
+    # subdirectory for the trial
+    dir_data_trial = os.path.join(args.dir_data, "dataset{:03}".format(trial))
 
-            # reshape as an image
-            image = np.reshape(image, (int(np.sqrt(np.size(image) / 3)),
-                                       int(np.sqrt(np.size(image) / 3)),
-                                       3)) / 255
+    # skip the trials already existing
+    if os.path.exists(dir_data_trial):
+        # TODO: check that folder is actually complete (in case of crash, the last run might have stopped before the end)
+        print("> trial {} already exists; skipped".format(dir_data_trial))
+        return None
 
-            # display
-            ax.imshow(image)
-            ax.axis("off")
+    print("[ENVIRONMENT {} >> data saved in {}]".format(trial, dir_data_trial))
 
-    plt.show()
+    # create the agent and environment according to the type of exploration
+    if args.type_simu == "gridexplorer3dof":
+        my_agent = Agents.GridExplorer3dof()
+        my_environment = Environments.GridWorld()
+    #
+    elif args.type_simu == "gridexplorer6dof":
+        my_agent = Agents.GridExplorer6dof()
+        my_environment = Environments.GridWorld()
+    #
+    elif args.type_simu == "armroom3dof":
+        my_agent = Agents.HingeArm3dof()  # working space of radius 1.5 in an environment of size 7
+        my_environment = Environments.GQNBulletRoom()
+    #
+    elif args.type_simu == "armroom6dof":
+        my_agent = Agents.HingeArm6dof()  # working space of radius 1.5 in an environment of size 7
+        my_environment = Environments.GQNBulletRoom()
+    #
+    else:
+        print("ERROR: invalid type of simulation - use 'gridexplorer3dof', 'gridexplorer6dof', 'armroom3dof', or 'armroom6dof'")
+        return False
 
-    return fig
+    # create the trial subdirectory
+    create_directory(dir_data_trial, safe=False)
+
+    # the environment is cleaned even if the generation fails or exits
+    try:
+
+        # save the agent, environment, and simulation on disk
+        my_agent.save(dir_data_trial)
+        my_environment.save(dir_data_trial)
+        save_simulation(dir_data_trial, args, trial)
+
+        # run the three types of exploration: MEM, MM, MME (the datasets are saved while the next trial is generated)
+        trial_generated = generate_sensorimotor_data(my_agent, my_environment, args.n_transitions, dir_data_trial,
+                                                     explo_types=("MEM", "MM", "MME"), disp=args.display_exploration, writer=writer)
+
+    finally:
+        # clean
+        my_environment.destroy()
+
+    # check the trial, unless its datasets are still being saved in the background (see check_trial_generated)
+    if isinstance(trial_generated, Future):
+        return trial_generated
+    return check_trial_generated(dir_data_trial, trial_generated)
+
+
+def check_trial_generated(dir_data_trial, trial_generated):
+    """
+    Checks the output of generate_sensorimotor_data for a trial, waiting for its datasets to be saved if it is done in the background.
+    The failed trials are removed, so that they are generated again by the next run instead of being skipped.
+    Inputs:
+        dir_data_trial - directory of the trial
+        trial_generated - output of generate_sensorimotor_data (or future of the background save of the datasets)
+    Returns:
+        True if the trial was successfully generated, and False otherwise
+    """
+
+    # wait for the datasets to be saved
+    if isinstance(trial_generated, Future):
+        trial_generated = trial_generated.result()
+
+    # remove the failed trial
+    if trial_generated is False:
+        print("> trial {} failed; removed".format(dir_data_trial))
+        shutil.rmtree(dir_data_trial)
+        return False
+
+    return True
 
 
 if __name__ == "__main__":
@@ -242,6 +348,7 @@ if __name__ == "__main__":
     parser.add_argument("-r", "--n_runs", dest="n_runs", help="number of independent datasets generated", type=int, default=1)
     parser.add_argument("-d", "--dir_data", dest="dir_data", help="directory where to save the data", required=True)
     parser.add_argument("-v", "--visual", dest="display_exploration", help="flag to turn the online display on or off", action="store_true")
+    parser.add_argument("-p", "--n_processes", dest="n_processes", help="number of trials generated in parallel", type=int, default=1)
     #
     args = parser.parse_args()
     n_transitions = args.n_transitions
@@ -249,67 +356,58 @@ if __name__ == "__main__":
     n_runs = args.n_runs
     dir_data = args.dir_data
     display_exploration = args.display_exploration
+    n_processes = args.n_processes
+
+    # check the number of processes
+    if n_processes < 1:
+        print("ERROR: invalid number of processes - use a positive integer")
+        sys.exit()
+
+    # the online display is only available when the trials are generated in the main process
+    if display_exploration and n_processes > 1:
+        print("WARNING: the online display requires generating the trials sequentially - --n_processes is set to 1")
+        n_processes = 1
 
     # create the data directory
     create_directory(dir_data)
 
-    # iterate over the runs
-    for trial in range(n_runs):
-
-        # subdirectory for the trial
-        dir_data_trial = "/".join([dir_data, "dataset{:03}".format(trial)])
-
-        # skip the trials already existing
-        if os.path.exists(dir_data_trial):
-            # TODO: check that folder is actually complete (in case of crash, the last run might have stopped before the end)
-            print("> trial {} already exists; skipped".format(dir_data_trial))
-            continue
-
-        print("[ENVIRONMENT {} >> data saved in {}]".format(trial, dir_data_trial))
-
-        # create the trial subdirectory
-        create_directory(dir_data_trial, safe=False)
-
-        # create the agent and environment according to the type of exploration
-        if type_simu == "gridexplorer3dof":
-            my_agent = Agents.GridExplorer3dof()
-            my_environment = Environments.GridWorld()
-        #
-        elif type_simu == "gridexplorer6dof":
-            my_agent = Agents.GridExplorer6dof()
-            my_environment = Environments.GridWorld()
-        #
-        elif type_simu == "armroom3dof":
-            my_agent = Agents.HingeArm3dof()  # working space of radius 1.5 in an environment of size 7
-            my_environment = Environments.GQNBulletRoom()
-        #
-        elif type_simu == "armroom6dof":
-            my_agent = Agents.HingeArm6dof()  # working space of radius 1.5 in an environment of size 7
-            my_environment = Environments.GQNBulletRoom()
-        #
-        else:
-            print("ERROR: invalid type of simulation - use 'gridexplorer3dof', 'gridexplorer6dof', 'armroom3dof', or 'armroom6dof'")
-            sys.exit()
+    # generate the trials (in parallel processes if requested, in which case each process saves its own datasets)
+    if n_processes == 1:
 
-        # save the agent, environment, and simulation on disk
-        my_agent.save(dir_data_trial)
-        my_environment.save(dir_data_trial)
-        save_simulation(dir_data_trial, args, trial)
+        # open a background thread to save the datasets (pending saves are completed on exit)
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            saves = []
+            for trial in range(n_runs):
+                trial_generated = generate_trial(args, trial, writer=writer)
+                if isinstance(trial_generated, Future):
+                    saves.append((os.path.join(dir_data, "dataset{:03}".format(trial)), trial_generated))
 
-        # run the three types of exploration: MEM, MM, MME
-        generate_sensorimotor_data(my_agent, my_environment, "MEM", n_transitions, dir_data_trial, disp=display_exploration)
-        generate_sensorimotor_data(my_agent, my_environment, "MM",  n_transitions, dir_data_trial, disp=display_exploration)
-        generate_sensorimotor_data(my_agent, my_environment, "MME", n_transitions, dir_data_trial, disp=display_exploration)
+                # check the previous saves, which are completed while the current trial is generated
+                while len(saves) > 1:
+                    check_trial_generated(*saves.pop(0))
 
-        # clean
-        my_environment.destroy()
+            # check the last save
+            for dir_data_trial, trial_generated in saves:
+                check_trial_generated(dir_data_trial, trial_generated)
+
+    else:
+
+        # the processes are spawned so that each one gets its own random state and builds its own environment (and PyBullet scene)
+        with multiprocessing.get_context("spawn").Pool(n_processes) as pool:
+            trials_generated = pool.starmap(generate_trial, [(args, trial) for trial in range(n_runs)], chunksize=1)
+
+        # report the failed trials (they have been removed by the processes, and are generated again by the next run)
+        failed_trials = [trial for trial, trial_generated in enumerate(trials_generated) if trial_generated is False]
+        if failed_trials:
+            print("WARNING: the generation of the trials {} failed - re-run the program to generate them".format(failed_trials))
 
     plt.ion()
 
     index_subdataset = 0
     for exploration_type in ["MEM", "MM", "MME"]:
         fh = display_samples(dir_data, index_subdataset, exploration_type, n=24)
-        fh.savefig(dir_data + "/sensory_samples_" + exploration_type + "_dataset" + str(index_subdataset) + ".png")
-        fh.savefig(dir_data + "/sensory_samples_" + exploration_type + "_dataset" + str(index_subdataset) + ".svg")
+        figure_name = os.path.join(dir_data, "sensory_samples_{}_dataset{}".format(exploration_type, index_subdataset))
+        fh.savefig(figure_name + ".png")
+        fh.savefig(figure_name + ".svg")
 
     input("Press any key to exit the program.")
@@ -4,6 +4,8 @@ import sys
 import numpy as np
 import _pickle as cpickle
 import subprocess
+import struct
+import zipfile
 
 
 def check_directory_exists(directory):
@@ -38,52 +40,123 @@ def get_git_hash():
     return hash
 
 
-def load_sensorimotor_transitions(data_directory, n_transitions=None):
+def memmap_archive_member(archive_file, info, mmap_mode="r"):
     """
-    Loads sensorimotor transitions from a file created by generate_sensorimotor_data.py.
-    Returns the data in a dictionary.
+    Memory-maps the array stored without compression in the member <info> of the .npz archive <archive_file>.
     """
+    with open(archive_file, "rb") as f:
 
-    # check dir_data
-    check_directory_exists(data_directory)
+        # skip the local header of the member (30 bytes followed by the file name and the extra field)
+        f.seek(info.header_offset)
+        name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
 
-    print("loading sensorimotor data from {}...".format(data_directory))
+        # read the header of the .npy array
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    return np.memmap(archive_file, dtype=dtype, mode=mmap_mode, shape=shape, order="F" if fortran_order else "C", offset=offset)
+
+
+def open_sensorimotor_dataset(data_file, explo_type, mmap_mode=None):
+    """
+    Returns the arrays of the explo_type dataset stored in a file created by generate_sensorimotor_data.py, as they were generated.
+    If mmap_mode is given (e.g. "r"), the arrays are memory-mapped instead of being read, so that only the accessed data are loaded.
+    Datasets saved in the previous format (one dataset_<explo_type>.pkl file per type of exploration, next to data_file) are also
+    supported, in which case mmap_mode is ignored.
+    """
 
-    with open(data_directory, 'rb') as f:
-        data = cpickle.load(f)
+    # fall back to the previous format if the dataset file doesn't exist
+    if not os.path.exists(data_file):
+        legacy_file = os.path.join(os.path.dirname(data_file), "dataset_{}.pkl".format(explo_type))
+        if os.path.exists(legacy_file):
+            print("loading {} data from {} (previous dataset format)".format(explo_type, legacy_file))
+            with open(legacy_file, 'rb') as f:
+                return cpickle.load(f)
 
-    # identify potential NaN entries
-    to_discard = np.argwhere(np.logical_or(np.isnan(data["sensor_t"][:, 0]), np.isnan(data["sensor_tp"][:, 0])))
+    # check data_file
+    check_directory_exists(data_file)
 
-    # remove NaN entries
-    for i in ["motor_t", "sensor_t", "shift_t", "motor_tp", "sensor_tp", "shift_tp"]:
-        data[i] = np.delete(data[i], to_discard, axis=0)
+    with zipfile.ZipFile(data_file) as archive:
 
-    # get the number of transitions
-    k = data["motor_t"].shape[0]
+        # check the type of exploration is in the file
+        members = archive.namelist()
+        if "{}/sensor_t.npy".format(explo_type) not in members:
+            print("ERROR: the dataset file {} doesn't contain {} data.".format(data_file, explo_type))
+            sys.exit()
 
-    # reduce the size of the dataset if necessary
-    if n_transitions is None:
-        n_transitions = k
-    elif n_transitions < k:
-        to_discard = np.arange(n_transitions, k)
-        for i in ["motor_t", "sensor_t", "shift_t", "motor_tp", "sensor_tp", "shift_tp"]:
-            data[i] = np.delete(data[i], to_discard, axis=0)
-    else:
-        n_transitions = k
-        print("Warning: the requested number of data is greater than the size of the dataset.")
+        data = {}
+        for key in ["motor_t", "sensor_t", "shift_t", "motor_tp", "sensor_tp", "shift_tp", "grid_motor", "grid_pos"]:
 
-    print("loaded {} sensorimotor data".format(n_transitions))
+            # get the array specific to the type of exploration, or the one shared by all the types
+            member = "{}/{}.npy".format(explo_type, key)
+            if member not in members:
+                member = "{}.npy".format(key)
+            info = archive.getinfo(member)
+
+            if mmap_mode is not None and info.compress_type == zipfile.ZIP_STORED:
+                data[key] = memmap_archive_member(data_file, info, mmap_mode)
+            else:
+                with archive.open(info) as f:
+                    data[key] = np.lib.format.read_array(f)
 
     return data
 
 
+def load_sensorimotor_transitions(data_file, explo_types=("MEM", "MM", "MME"), n_transitions=None):
+    """
+    Loads sensorimotor transitions from a dataset file created by generate_sensorimotor_data.py.
+    Returns a dictionary containing the data of each type of exploration in explo_types (each stored in a dictionary).
+    """
+
+    print("loading sensorimotor data from {}...".format(data_file))
+
+    datasets = {}
+    for explo_type in explo_types:
+
+        data = datasets[explo_type] = open_sensorimotor_dataset(data_file, explo_type)
+
+        # identify and remove potential NaN entries (only floating-point sensations can be NaN)
+        if np.issubdtype(data["sensor_t"].dtype, np.floating):
+            to_discard = np.argwhere(np.logical_or(np.isnan(data["sensor_t"][:, 0]), np.isnan(data["sensor_tp"][:, 0])))
+            for i in ["motor_t", "sensor_t", "shift_t", "motor_tp", "sensor_tp", "shift_tp"]:
+                data[i] = np.delete(data[i], to_discard, axis=0)
+
+        # get the number of transitions
+        k = data["motor_t"].shape[0]
+
+        # reduce the size of the dataset if necessary
+        if n_transitions is None:
+            n_data = k
+        elif n_transitions < k:
+            n_data = n_transitions
+            to_discard = np.arange(n_transitions, k)
+            for i in ["motor_t", "sensor_t", "shift_t", "motor_tp", "sensor_tp", "shift_tp"]:
+                data[i] = np.delete(data[i], to_discard, axis=0)
+        else:
+            n_data = k
+            print("Warning: the requested number of data is greater than the size of the dataset.")
+
+        print("loaded {} {} sensorimotor data".format(n_data, explo_type))
+
+    return datasets
+
+
 def normalize_data(data):
     """
     Normalize the data such that the motor and sensor components are in [-1, 1]
     We don't normalize the positions of the sensor and shift of the environment, to keep the real scale of the external space.
     """
 
+    # convert the integer sensations (3dRoom images are stored as uint8) to floats to normalize them
+    for key in ["sensor_t", "sensor_tp"]:
+        if not np.issubdtype(data[key].dtype, np.floating):
+            data[key] = data[key].astype(np.float32)
+
     # get the min/max of the motor configurations, sensations, and shifts
     motor_min = np.nanmin(data["motor_t"], axis=0)
     motor_max = np.nanmax(data["motor_t"], axis=0)
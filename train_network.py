@@ -104,26 +104,33 @@ if __name__ == "__main__":
 
         print("[[TRIAL {}]]".format(trial))
 
-        # run the training on the different types of data
-        for simu_type in simu_types:
+        # get the correct data folder and file name
+        sub_dir_data = "{}/dataset{:03}".format(dir_data, trial % len(subfolder_list))
+        filename = "{}/dataset.npz".format(sub_dir_data)
 
-            # get the correct data folder and file name
-            sub_dir_data = "{}/dataset{:03}".format(dir_data, trial % len(subfolder_list))
-            filename = "{}/dataset_{}.pkl".format(sub_dir_data, simu_type)
+        # get the destination folders
+        dirs_model_trial = {simu_type: "/".join([dir_model, simu_type, "run" + "{:03}".format(trial)]) for simu_type in simu_types}
 
-            # get the destination folder
-            dir_model_trial = "/".join([dir_model, simu_type, "run" + "{:03}".format(trial)])
-
-            # skip the trials already existing
-            if os.path.exists(dir_model_trial):
+        # skip the trials already existing
+        trial_simu_types = []
+        for simu_type in simu_types:
+            if os.path.exists(dirs_model_trial[simu_type]):
                 # TODO: check that folder is actually complete (in case of crash, the last run might have stopped before the end)
-                print("> trial {} already exists; skipped".format(dir_model_trial))
-                continue
+                print("> trial {} already exists; skipped".format(dirs_model_trial[simu_type]))
+            else:
+                trial_simu_types.append(simu_type)
+        if not trial_simu_types:
+            continue
+
+        # run the training on the different types of data
+        for simu_type in trial_simu_types:
+
+            dir_model_trial = dirs_model_trial[simu_type]
 
             print("[{} EXPLORATION - (dataset: {})]".format(simu_type, filename))
 
-            # load the data
-            transitions = load_sensorimotor_transitions(filename)
+            # load the data (one type of exploration at a time, so that only the dataset being trained on is in memory)
+            transitions = load_sensorimotor_transitions(filename, [simu_type])[simu_type]
             dim_m = transitions["motor_t"].shape[1]
             dim_s = transitions["sensor_t"].shape[1]
 